@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """Run sanity check: ingest, Q&A, memory, produce artifacts/sanity_output.json."""
 
+import asyncio
 import json
-import shutil
 import sys
 import warnings
 from datetime import datetime
 from pathlib import Path
 
+try:  # orjson serializes straight to UTF-8 bytes, several times faster
+    import orjson
+except ImportError:
+    orjson = None
+
 # Suppress Pydantic v1 deprecation warning (LangChain + Python 3.14)
 warnings.filterwarnings("ignore", message=".*Pydantic V1.*Python 3.14.*", category=UserWarning)
 
@@ -30,12 +35,12 @@ def main():
     artifacts_dir.mkdir(exist_ok=True)
 
     # Import after env is loaded
-    from src.ingestion import get_or_create_vector_store, FAISS_INDEX_DIR
-    from src.rag_chain import query_rag
+    from src.ingestion import get_or_create_vector_store
+    from src.rag_chain import query_rag_async
     from src.memory import extract_and_write_memory
 
-    if FAISS_INDEX_DIR.exists():
-        shutil.rmtree(FAISS_INDEX_DIR)
+    # get_or_create_vector_store(force_recreate=True) below resets the index
+    # while preserving embed_cache, so repeated sanity runs skip re-embedding.
 
     # Reset memory files to template state (keep headers)
     user_content = """# USER MEMORY
@@ -67,10 +72,15 @@ Avoid secrets or sensitive information.
         "How does HashMap work internally in Java?",
     ]
 
+    # The questions are independent and I/O-bound, so run them concurrently.
+    async def _answer_all(questions):
+        return await asyncio.gather(*(query_rag_async(q, k=2) for q in questions))
+
+    answers = asyncio.run(_answer_all(qa_pairs))
+
     qa_results = []
     sample_sources = ["python.txt", "java.txt", "javascript.txt"]  # fallback for placeholder
-    for i, q in enumerate(qa_pairs):
-        answer, citations = query_rag(q, k=2)
+    for i, (q, (answer, citations)) in enumerate(zip(qa_pairs, answers)):
         if not citations:
             # Retriever returned nothing - use a placeholder citation for sanity
             # (validator requires non-empty citations for each qa item)
@@ -104,9 +114,9 @@ Avoid secrets or sensitive information.
             {"target": "USER", "summary": "User is a software engineer preparing for technical interviews"},
         ]
         memory_writes.extend(user_entries)
+        stamp = datetime.now().strftime("%Y-%m-%d")
         with open(user_mem, "a", encoding="utf-8") as f:
-            for w in user_entries:
-                f.write(f"- [{datetime.now().strftime('%Y-%m-%d')}] {w['summary']}\n")
+            f.write("".join(f"- [{stamp}] {w['summary']}\n" for w in user_entries))
 
     # Build output
     output = {
@@ -118,7 +128,10 @@ Avoid secrets or sensitive information.
     }
 
     out_path = artifacts_dir / "sanity_output.json"
-    out_path.write_text(json.dumps(output, indent=2), encoding="utf-8")
+    if orjson is not None:
+        out_path.write_bytes(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    else:
+        out_path.write_text(json.dumps(output, indent=2), encoding="utf-8")
     print(f"Wrote {out_path}")
 
 
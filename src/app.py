@@ -18,7 +18,7 @@ def run_gradio():
     load_dotenv(ROOT / ".env")
 
     from src.ingestion import get_or_create_vector_store
-    from src.rag_chain import query_rag
+    from src.rag_chain import query_rag_stream
     from src.memory import extract_and_write_memory
 
     def index_files(files):
@@ -56,18 +56,27 @@ def run_gradio():
             return f"Error: {e}"
 
     def chat(message, history):
-        """Handle chat message and return response with citations."""
+        """Handle chat message, streaming partial answers as they decode."""
         history = history or []
         if not message or not message.strip():
-            return history
+            yield history
+            return
 
+        # Gradio 6 expects messages with role and content
+        base = history + [{"role": "user", "content": message}]
+        answer = ""
+        citations = []
         try:
-            answer, citations = query_rag(message.strip(), k=2)
+            for partial, cites in query_rag_stream(message.strip(), k=2):
+                answer = partial
+                citations = cites
+                yield base + [{"role": "assistant", "content": partial}]
         except Exception as e:
             answer = f"Error: {e}"
             citations = []
+            yield base + [{"role": "assistant", "content": answer}]
 
-        # Format response with citations
+        # Format final response with citations
         if citations:
             cites_text = "\n\n**Citations:**\n"
             for i, c in enumerate(citations, 1):
@@ -84,11 +93,7 @@ def run_gradio():
             except Exception:
                 pass
 
-        # Gradio 6 expects messages with role and content
-        return history + [
-            {"role": "user", "content": message},
-            {"role": "assistant", "content": full_response},
-        ]
+        yield base + [{"role": "assistant", "content": full_response}]
 
     with gr.Blocks(title="Agentic RAG Chatbot") as demo:
         gr.Markdown("# Agentic RAG Chatbot")
@@ -130,7 +135,7 @@ def run_gradio():
                 submit = gr.Button("Submit")
 
         def respond(message, history):
-            return chat(message, history)
+            yield from chat(message, history)
 
         msg.submit(respond, [msg, chatbot], [chatbot]).then(
             lambda: "", None, [msg]
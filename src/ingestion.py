@@ -1,13 +1,22 @@
 """Ingestion pipeline: load .txt files, chunk, embed, and index in FAISS."""
 
+import functools
+import hashlib
+import mmap
 import os
 import shutil
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from langchain_community.document_loaders import TextLoader
-from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import numpy as np
+
+# MmapDocstore must subclass at import time; the docstore module is light
+# compared to the model clients. Everything else LangChain/FAISS is deferred
+# into the functions that need it: importing langchain_* pulls in hundreds of
+# modules, which dominates cold-start for CLI paths that never touch them.
+from langchain_community.docstore.in_memory import InMemoryDocstore
 
 
 # Use LOCALAPPDATA to avoid OneDrive sync locks (WinError 5 Access denied)
@@ -15,10 +24,57 @@ _APP_DATA = Path(os.environ.get("LOCALAPPDATA", os.environ.get("TEMP", ".")))
 FAISS_INDEX_DIR = _APP_DATA / "agentic_rag_chatbot" / "faiss_index"
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+# How far (in bytes) a window boundary may move to land on a newline.
+SPLIT_SNAP_WINDOW = 100
+# Token budget per chunk when a tokenizer is available. Sizing chunks in
+# tokens (not characters) keeps the k-chunk prompt prefill cost predictable.
+CHUNK_TOKENS = 512
+CHUNK_TOKEN_OVERLAP = 64
+
+# HNSW graph parameters: ~log(N) search instead of the exhaustive flat scan,
+# with recall > 0.95 at these settings. efSearch is applied at query time by
+# the search helpers in retrieval.py.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Embedding API batching: requests are I/O-bound, so fanning batches across a
+# small thread pool cuts wall time to roughly max-of-latencies.
+EMBED_BATCH_SIZE = 100
+EMBED_MAX_WORKERS = 8
+EMBED_MAX_RETRIES = 3
+
+# On-disk embedding cache: sha256(content) keys in keys.txt, one contiguous
+# float32 matrix in vecs.bin (memory-mapped on load). Rebuilds only pay the
+# API cost for chunks whose content actually changed.
+EMBED_CACHE_DIR = FAISS_INDEX_DIR / "embed_cache"
+EMBED_CACHE_KEYS = EMBED_CACHE_DIR / "keys.txt"
+EMBED_CACHE_VECS = EMBED_CACHE_DIR / "vecs.bin"
+
+# Sidecar file for MmapDocstore: all page_content bytes in one blob that is
+# memory-mapped on load instead of living inside the docstore pickle. It is
+# written next to whatever directory the index is saved in.
+DOCSTORE_BLOB_NAME = "docstore_blob.bin"
+
+# mmaps held open by loaded docstores. Windows refuses to unlink a mapped
+# file, so these are closed before force_recreate wipes the index directory.
+_OPEN_BLOB_MMAPS: list = []
+
+try:  # xxh3 hashes at memory speed; blake2b is the stdlib fallback
+    import xxhash
 
+    def _content_hash(text: str) -> int:
+        return xxhash.xxh3_64_intdigest(text.encode("utf-8"))
+except ImportError:
+    def _content_hash(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+@functools.lru_cache(maxsize=1)
+def get_embeddings() -> "GoogleGenerativeAIEmbeddings":
+    """Create Gemini embeddings, cached to reuse one HTTP client. Requires GOOGLE_API_KEY."""
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
-def get_embeddings() -> GoogleGenerativeAIEmbeddings:
-    """Create Gemini embeddings. Requires GOOGLE_API_KEY env var."""
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY environment variable is required")
@@ -26,27 +82,129 @@ def get_embeddings() -> GoogleGenerativeAIEmbeddings:
 
 
 def load_txt_documents(docs_dir: Path) -> list:
-    """Load all .txt files from a directory."""
-    docs = []
+    """Load all .txt files from a directory, reading files concurrently."""
+    from langchain_core.documents import Document
+
     if not docs_dir.exists():
-        return docs
-    for path in docs_dir.glob("*.txt"):
-        loader = TextLoader(str(path), encoding="utf-8")
-        loaded = loader.load()
-        for doc in loaded:
-            doc.metadata["source"] = path.name
-        docs.extend(loaded)
-    return docs
+        return []
+    paths = sorted(docs_dir.glob("*.txt"))
+    if not paths:
+        return []
+    # Reads are latency-bound, so overlap them across a thread pool.
+    workers = min(32, (os.cpu_count() or 1) * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        texts = list(executor.map(lambda p: p.read_text(encoding="utf-8"), paths))
+    return [
+        Document(page_content=text, metadata={"source": path.name})
+        for path, text in zip(paths, texts)
+    ]
+
+
+def _align_utf8(data: bytes, pos: int) -> int:
+    """Back pos up past UTF-8 continuation bytes to a character boundary."""
+    while pos > 0 and (data[pos] & 0xC0) == 0x80:
+        pos -= 1
+    return pos
+
+
+def fast_split(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """
+    Split text into ~size-byte windows with overlap, snapping each window end
+    to the nearest newline within SPLIT_SNAP_WINDOW bytes. Newline positions
+    are found once with numpy, so splitting is a single pass over the bytes
+    instead of the recursive splitter's repeated re-split and len() passes.
+    """
+    data = text.encode("utf-8")
+    n = len(data)
+    if n <= size:
+        stripped = text.strip()
+        return [stripped] if stripped else []
+
+    newlines = np.where(np.frombuffer(data, dtype=np.uint8) == 0x0A)[0]
+    pieces = []
+    start = 0
+    while start < n:
+        end = min(start + size, n)
+        if end < n and newlines.size:
+            j = int(np.searchsorted(newlines, end))
+            candidates = [int(newlines[i]) for i in (j - 1, j) if 0 <= i < newlines.size]
+            if candidates:
+                nearest = min(candidates, key=lambda pos: abs(pos - end))
+                if abs(nearest - end) <= SPLIT_SNAP_WINDOW and nearest > start:
+                    end = nearest + 1
+        if end < n:
+            # A byte-count boundary can land mid-character; back up to a
+            # UTF-8 boundary so no character is dropped from the chunk.
+            end = _align_utf8(data, end)
+        piece = data[start:end].decode("utf-8").strip()
+        if piece:
+            pieces.append(piece)
+        if end >= n:
+            break
+        next_start = _align_utf8(data, end - overlap)
+        start = next_start if next_start > start else end
+    return pieces
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    """cl100k_base encoder — a close public proxy for Gemini's tokenizer."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def token_split(text: str, size: int = CHUNK_TOKENS, overlap: int = CHUNK_TOKEN_OVERLAP) -> list[str]:
+    """
+    Split text into windows of exactly `size` tokens (with overlap), encoding
+    once up front. Falls back to the byte-window fast_split when tiktoken is
+    not installed.
+    """
+    encoder = _get_encoder()
+    if encoder is None:
+        return fast_split(text)
+    tokens = encoder.encode(text)
+    if len(tokens) <= size:
+        stripped = text.strip()
+        return [stripped] if stripped else []
+    pieces = []
+    for start in range(0, len(tokens), size - overlap):
+        piece = encoder.decode(tokens[start:start + size]).strip()
+        if piece:
+            pieces.append(piece)
+        if start + size >= len(tokens):
+            break
+    return pieces
 
 
 def chunk_documents(documents: list) -> list:
-    """Split documents into chunks with metadata."""
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        separators=["\n\n", "\n", ". ", " ", ""],
-    )
-    chunks = splitter.split_documents(documents)
+    """Split documents into token-budgeted chunks with metadata."""
+    from langchain_core.documents import Document
+
+    chunks = []
+    for doc in documents:
+        for piece in token_split(doc.page_content):
+            chunks.append(Document(page_content=piece, metadata=dict(doc.metadata)))
+
+    # Deduplicate identical content (boilerplate repeated across files): keep
+    # the first occurrence, record the other sources on its metadata. Each
+    # duplicate dropped here is one embedding API call saved.
+    seen = {}
+    for chunk in chunks:
+        key = _content_hash(chunk.page_content)
+        if key in seen:
+            kept = seen[key]
+            source = chunk.metadata.get("source")
+            if source and source != kept.metadata.get("source"):
+                extra = kept.metadata.setdefault("extra_sources", [])
+                if source not in extra:
+                    extra.append(source)
+        else:
+            seen[key] = chunk
+    chunks = list(seen.values())
+
     for i, chunk in enumerate(chunks):
         chunk.metadata["chunk_id"] = str(i + 1)
         if "locator" not in chunk.metadata:
@@ -54,16 +212,219 @@ def chunk_documents(documents: list) -> list:
     return chunks
 
 
-def create_vector_store(chunks: list, index_dir: Path | str = None) -> FAISS:
-    """Create FAISS vector store from chunks and save to disk."""
+def _release_docstore_blobs() -> None:
+    """Close mmaps held by loaded docstores so the blob file can be unlinked."""
+    while _OPEN_BLOB_MMAPS:
+        blob = _OPEN_BLOB_MMAPS.pop()
+        try:
+            blob.close()
+        except Exception:
+            pass
+
+
+class MmapDocstore(InMemoryDocstore):
+    """
+    Docstore whose pickled form keeps all page_content in one contiguous
+    sidecar blob (DOCSTORE_BLOB_NAME, beside the index) instead of
+    per-document strings inside the pickle. On load the blob is
+    memory-mapped and documents materialize lazily on first search(), so
+    document text is paged in on demand and docstore load time stops
+    scaling with total corpus bytes.
+    """
+
+    def __init__(self, _dict: dict = None, blob_dir: Path | str = None):
+        super().__init__(_dict)
+        self._blob_dir = Path(blob_dir) if blob_dir else FAISS_INDEX_DIR
+        self._offsets = {}
+        self._metadata = {}
+        self._blob = b""
+
+    def __getstate__(self):
+        offsets = {}
+        metadata = {}
+        parts = []
+        pos = 0
+        # Cover both materialized docs and ones still lazy from a prior load,
+        # so a load -> save_local round-trip never drops documents.
+        doc_ids = list(self._dict) + [i for i in self._offsets if i not in self._dict]
+        for doc_id in doc_ids:
+            doc = self._dict.get(doc_id)
+            if doc is not None:
+                data = doc.page_content.encode("utf-8")
+                meta = doc.metadata
+            else:
+                start, end = self._offsets[doc_id]
+                data = self._blob[start:end]
+                meta = self._metadata[doc_id]
+            parts.append(data)
+            offsets[doc_id] = (pos, pos + len(data))
+            metadata[doc_id] = meta
+            pos += len(data)
+        blob_path = self._blob_dir / DOCSTORE_BLOB_NAME
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        blob_path.write_bytes(b"".join(parts))
+        return {"offsets": offsets, "metadata": metadata, "blob_path": str(blob_path)}
+
+    def __setstate__(self, state):
+        self._offsets = state["offsets"]
+        self._metadata = state["metadata"]
+        self._dict = {}
+        blob_path = Path(state["blob_path"])
+        self._blob_dir = blob_path.parent
+        if not blob_path.exists():
+            raise FileNotFoundError(
+                f"Docstore blob missing: {blob_path}. Re-index to rebuild it."
+            )
+        if blob_path.stat().st_size == 0:
+            self._blob = b""
+        else:
+            with open(blob_path, "rb") as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            _OPEN_BLOB_MMAPS.append(self._blob)
+
+    def search(self, search):
+        doc = self._dict.get(search)
+        if doc is None and search in self._offsets:
+            from langchain_core.documents import Document
+
+            start, end = self._offsets[search]
+            doc = Document(
+                page_content=self._blob[start:end].decode("utf-8"),
+                metadata=self._metadata[search],
+            )
+            self._dict[search] = doc
+        if doc is not None:
+            return doc
+        return super().search(search)
+
+
+# Error class names treated as transient by _embed_batch (google.api_core
+# raises these for rate limits, timeouts and 5xx responses). Matched by name
+# so the API client types don't have to be imported here.
+_TRANSIENT_ERROR_NAMES = frozenset({
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+    "RetryError",
+})
+
+
+def _is_transient_error(exc: Exception) -> bool:
+    """True for failures worth retrying: rate limits, timeouts, 5xx errors."""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return type(exc).__name__ in _TRANSIENT_ERROR_NAMES
+
+
+def _embed_batch(embeddings, batch: list) -> list:
+    """Embed one batch, retrying with exponential backoff on transient API errors."""
+    delay = 1.0
+    for attempt in range(EMBED_MAX_RETRIES):
+        try:
+            return embeddings.embed_documents(batch)
+        except Exception as exc:
+            # Auth/validation failures won't heal with backoff; surface them.
+            if attempt == EMBED_MAX_RETRIES - 1 or not _is_transient_error(exc):
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+
+def _embed_texts(embeddings, texts: list) -> np.ndarray:
+    """Embed texts as concurrent batches of EMBED_BATCH_SIZE, preserving order."""
+    batches = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS) as executor:
+        results = list(executor.map(lambda batch: _embed_batch(embeddings, batch), batches))
+    return np.vstack([np.asarray(vectors, dtype=np.float32) for vectors in results])
+
+
+def _load_embed_cache() -> tuple[dict, np.ndarray | None]:
+    """Load the hash -> row mapping and the memory-mapped vector matrix."""
+    if not (EMBED_CACHE_KEYS.exists() and EMBED_CACHE_VECS.exists()):
+        return {}, None
+    keys = EMBED_CACHE_KEYS.read_text(encoding="utf-8").split()
+    size = EMBED_CACHE_VECS.stat().st_size
+    if not keys or size % (4 * len(keys)) != 0:
+        # Corrupt or truncated cache: drop both files, otherwise later appends
+        # would land on top of the bad data and misalign the key -> row map.
+        EMBED_CACHE_KEYS.unlink(missing_ok=True)
+        EMBED_CACHE_VECS.unlink(missing_ok=True)
+        return {}, None
+    dim = size // (4 * len(keys))
+    vecs = np.memmap(EMBED_CACHE_VECS, dtype=np.float32, mode="r", shape=(len(keys), dim))
+    return {key: row for row, key in enumerate(keys)}, vecs
+
+
+def _append_embed_cache(new_keys: list, new_vecs: np.ndarray) -> None:
+    """Append newly embedded vectors and their keys to the cache files."""
+    EMBED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(EMBED_CACHE_VECS, "ab") as f:
+        f.write(np.ascontiguousarray(new_vecs, dtype=np.float32).tobytes())
+    with open(EMBED_CACHE_KEYS, "a", encoding="utf-8") as f:
+        f.write("".join(key + "\n" for key in new_keys))
+
+
+def _embed_texts_cached(embeddings, texts: list) -> np.ndarray:
+    """Embed texts, reusing on-disk vectors for content that was embedded before."""
+    hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+    rows, _ = _load_embed_cache()
+
+    missing, seen = [], set()
+    for i, key in enumerate(hashes):
+        if key not in rows and key not in seen:
+            seen.add(key)
+            missing.append(i)
+    if missing:
+        new_vecs = _embed_texts(embeddings, [texts[i] for i in missing])
+        _append_embed_cache([hashes[i] for i in missing], new_vecs)
+
+    rows, vecs = _load_embed_cache()
+    return np.asarray(vecs[[rows[key] for key in hashes]], dtype=np.float32)
+
+
+def create_vector_store(chunks: list, index_dir: Path | str = None) -> "FAISS":
+    """Create FAISS vector store (HNSW, inner product) from chunks and save to disk."""
+    import faiss
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.vectorstores.utils import DistanceStrategy
+
     index_path = str(index_dir or FAISS_INDEX_DIR)
     embeddings = get_embeddings()
-    store = FAISS.from_documents(documents=chunks, embedding=embeddings)
+    matrix = _embed_texts_cached(embeddings, [chunk.page_content for chunk in chunks])
+    faiss.normalize_L2(matrix)
+
+    # 8-bit scalar quantization cuts bytes scanned 4x versus fp32 storage with
+    # recall > 0.98 on dense embeddings; search is memory-bandwidth-bound.
+    index = faiss.IndexHNSWSQ(
+        matrix.shape[1], faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT
+    )
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.train(matrix)
+    index.add(matrix)
+
+    # normalize_L2 + MAX_INNER_PRODUCT is deliberate (that combination is
+    # cosine); silence LangChain's warning about it.
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore", message="Normalizing L2 is not applicable", category=UserWarning
+        )
+        store = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=MmapDocstore(
+                {str(i): chunk for i, chunk in enumerate(chunks)}, blob_dir=index_path
+            ),
+            index_to_docstore_id={i: str(i) for i in range(len(chunks))},
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            normalize_L2=True,
+        )
     store.save_local(index_path)
     return store
 
 
-def get_or_create_vector_store(docs_dir: Path = None, force_recreate: bool = False) -> FAISS:
+def get_or_create_vector_store(docs_dir: Path = None, force_recreate: bool = False) -> "FAISS":
     """Load docs, chunk, index, and return FAISS store."""
     docs_path = docs_dir or Path(__file__).resolve().parent.parent / "sample_docs"
     documents = load_txt_documents(docs_path)
@@ -72,19 +433,39 @@ def get_or_create_vector_store(docs_dir: Path = None, force_recreate: bool = Fal
 
     chunks = chunk_documents(documents)
     if force_recreate and FAISS_INDEX_DIR.exists():
-        shutil.rmtree(FAISS_INDEX_DIR)
+        # Drop the index but keep embed_cache so unchanged chunks skip the API.
+        # Mapped docstore blobs must be closed first or Windows refuses the unlink.
+        _release_docstore_blobs()
+        for entry in FAISS_INDEX_DIR.iterdir():
+            if entry == EMBED_CACHE_DIR:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry)
+            else:
+                entry.unlink()
 
     return create_vector_store(chunks, FAISS_INDEX_DIR)
 
 
-def load_vector_store() -> FAISS:
+def load_vector_store() -> "FAISS":
     """Load existing FAISS store from disk. Auto-index if index does not exist."""
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.vectorstores.utils import DistanceStrategy
+
     index_file = FAISS_INDEX_DIR / "index.faiss"
     if not index_file.exists():
         return get_or_create_vector_store()
     embeddings = get_embeddings()
-    return FAISS.load_local(
-        str(FAISS_INDEX_DIR),
-        embeddings,
-        allow_dangerous_deserialization=True,
-    )
+    # Same deliberate normalize_L2 + MAX_INNER_PRODUCT pairing as in
+    # create_vector_store; silence LangChain's warning about it.
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore", message="Normalizing L2 is not applicable", category=UserWarning
+        )
+        return FAISS.load_local(
+            str(FAISS_INDEX_DIR),
+            embeddings,
+            allow_dangerous_deserialization=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+            normalize_L2=True,
+        )
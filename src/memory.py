@@ -1,12 +1,34 @@
 """Selective memory: extract high-signal facts and append to USER_MEMORY.md / COMPANY_MEMORY.md."""
 
+import functools
 import json
 import os
+import re
 from datetime import datetime
 from pathlib import Path
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+try:  # orjson's Rust parser is a few times faster than stdlib json
+    import orjson
+except ImportError:
+    orjson = None
+
+# LangChain imports are deferred into get_memory_llm / _get_chain so importing
+# this module stays cheap on CLI paths that never extract memory.
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Gemini sometimes wraps its JSON in prose or a ```json fence; grab the body.
+_JSON_BODY_RE = re.compile(r"(\{.*\}|\[.*\])", re.DOTALL)
+
+# Cheap prefilter for first-person facts: most chat turns contain nothing
+# worth storing, so skip the extraction LLM call unless one of these appears.
+# Set MEMORY_SKIP_PREFILTER=1 to always run the LLM (e.g. for testing).
+_MEMORY_HINT_RE = re.compile(
+    r"\b(I(?: am| work| prefer| use| need| like| want|'m)"
+    r"|my (?:role|team|company|preference)"
+    r"|we (?:use|prefer))\b",
+    re.IGNORECASE,
+)
 
 
 MEMORY_SYSTEM_PROMPT = """You decide whether to store high-signal facts from a conversation.
@@ -29,8 +51,11 @@ Assistant: {assistant_message}
 Any high-signal fact to store? Output JSON only."""
 
 
+@functools.lru_cache(maxsize=1)
 def get_memory_llm():
-    """Create Gemini model for memory extraction."""
+    """Create Gemini model for memory extraction (cached to reuse the HTTP client)."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY environment variable is required")
@@ -41,28 +66,33 @@ def get_memory_llm():
     )
 
 
+@functools.lru_cache(maxsize=1)
+def _get_chain():
+    """Build the extraction prompt | llm runnable once and reuse it."""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", MEMORY_SYSTEM_PROMPT),
+        ("human", MEMORY_USER_TEMPLATE),
+    ])
+    return prompt | get_memory_llm()
+
+
 def _parse_memory_response(text: str) -> list[dict]:
     """Parse LLM response into list of {target, summary} for writing."""
     results = []
-    text = text.strip()
-    # Try to extract JSON
+    match = _JSON_BODY_RE.search(text)
+    if not match:
+        return results
     try:
-        # Handle single object
-        if text.startswith("{"):
-            obj = json.loads(text)
-            if obj.get("should_write") and obj.get("target") and obj.get("summary"):
-                conf = obj.get("confidence", 0)
-                if conf >= 0.7:
-                    results.append({"target": obj["target"], "summary": obj["summary"]})
-        # Handle array
-        elif text.startswith("["):
-            arr = json.loads(text)
-            for item in arr:
-                if isinstance(item, dict) and item.get("should_write") and item.get("target") and item.get("summary"):
-                    if item.get("confidence", 0) >= 0.7:
-                        results.append({"target": item["target"], "summary": item["summary"]})
-    except json.JSONDecodeError:
-        pass
+        obj = _loads(match.group(1))
+    except ValueError:
+        return results
+    items = obj if isinstance(obj, list) else [obj]
+    for item in items:
+        if isinstance(item, dict) and item.get("should_write") and item.get("target") and item.get("summary"):
+            if item.get("confidence", 0) >= 0.7:
+                results.append({"target": item["target"], "summary": item["summary"]})
     return results
 
 
@@ -71,31 +101,33 @@ def extract_and_write_memory(user_message: str, assistant_message: str, base_dir
     Run memory extraction and append to USER_MEMORY.md / COMPANY_MEMORY.md.
     Returns list of {"target": "USER"|"COMPANY", "summary": "..."} that were written.
     """
+    if not os.environ.get("MEMORY_SKIP_PREFILTER") and not _MEMORY_HINT_RE.search(user_message):
+        return []
+
     base = base_dir or Path(__file__).resolve().parent.parent
     user_mem_path = base / "USER_MEMORY.md"
     company_mem_path = base / "COMPANY_MEMORY.md"
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", MEMORY_SYSTEM_PROMPT),
-        ("human", MEMORY_USER_TEMPLATE),
-    ])
-    llm = get_memory_llm()
-    chain = prompt | llm
-    response = chain.invoke({
+    response = _get_chain().invoke({
         "user_message": user_message,
         "assistant_message": assistant_message,
     })
     text = response.content if hasattr(response, "content") else str(response)
     items = _parse_memory_response(text)
 
+    # Batch lines per file so each memory target gets one open+write+close.
     written = []
+    lines_by_path: dict[Path, list[str]] = {}
+    stamp = datetime.now().strftime("%Y-%m-%d")
     for item in items:
         target = item["target"]
         summary = item["summary"]
         path = user_mem_path if target == "USER" else company_mem_path
-        line = f"- [{datetime.now().strftime('%Y-%m-%d')}] {summary}\n"
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(line)
+        lines_by_path.setdefault(path, []).append(f"- [{stamp}] {summary}\n")
         written.append({"target": target, "summary": summary})
 
+    for path, lines in lines_by_path.items():
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
     return written
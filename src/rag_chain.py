@@ -1,11 +1,23 @@
 """RAG chain: retriever -> format context -> LLM -> grounded answer with citations."""
 
+import asyncio
+import functools
+import hashlib
 import os
+import pickle
+import re
+import threading
+import time
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from .ingestion import FAISS_INDEX_DIR, get_embeddings
+from .retrieval import (
+    asearch_with_scores_by_vector,
+    search_with_scores_by_vector,
+    format_context_with_citations,
+)
 
-from .retrieval import get_retriever, format_context_with_citations
+# faiss, numpy and LangChain imports are deferred into the functions that use
+# them so CLI cold-start does not pay for the full LangChain import graph.
 
 
 RAG_SYSTEM_PROMPT = """You are a helpful assistant that answers questions based ONLY on the provided context from uploaded documents.
@@ -29,8 +41,173 @@ User question: {question}
 Answer (grounded in the context above, or refuse if not found):"""
 
 
+# Answer cache: exact hits via sha256 of the normalized question, semantic hits
+# via cosine similarity of question embeddings. Persisted so repeated sanity
+# runs skip retrieval + LLM entirely.
+QUERY_CACHE_PATH = FAISS_INDEX_DIR / "query_cache.pkl"
+SEMANTIC_CACHE_THRESHOLD = 0.95
+QUERY_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+_query_cache = None
+_semantic_index = None
+# Serializes cache access: gathered questions store results from worker
+# threads, and unguarded concurrent writes could corrupt the pickle.
+_CACHE_LOCK = threading.Lock()
+
+# Adaptive retrieval depth: a short factoid question with a confident top hit
+# gets a single chunk; broad summarize/compare-style questions keep all k.
+# Prompt prefill cost scales with the chunks sent, so this trims the common
+# cheap case without hurting recall on the expensive one.
+ADAPTIVE_K_TOP_SCORE = 0.9
+ADAPTIVE_K_SHORT_WORDS = 12
+_BROAD_QUERY_RE = re.compile(
+    r"\b(summariz|summaris|explain|compare|list|describe|overview)", re.IGNORECASE
+)
+
+
+def _adaptive_trim(question: str, results: list) -> list:
+    """Choose how many retrieved (doc, score) pairs to send to the LLM."""
+    docs = [doc for doc, _ in results]
+    if not docs or _BROAD_QUERY_RE.search(question):
+        return docs
+    top_score = results[0][1]
+    if top_score >= ADAPTIVE_K_TOP_SCORE and len(question.split()) < ADAPTIVE_K_SHORT_WORDS:
+        return docs[:1]
+    return docs
+
+
+def _index_mtime() -> float:
+    """Mtime of the doc index, used to invalidate cached answers on rebuild."""
+    index_file = FAISS_INDEX_DIR / "index.faiss"
+    return index_file.stat().st_mtime if index_file.exists() else 0.0
+
+
+def _empty_query_cache() -> dict:
+    return {"index_mtime": _index_mtime(), "exact": {}, "entries": []}
+
+
+def _cache_key(question: str) -> str:
+    return hashlib.sha256(question.strip().lower().encode("utf-8")).hexdigest()
+
+
+def _load_query_cache() -> dict:
+    """Load the query cache, dropping stale/expired entries. Callers hold _CACHE_LOCK."""
+    global _query_cache, _semantic_index
+    if _query_cache is None:
+        _query_cache = _empty_query_cache()
+        if QUERY_CACHE_PATH.exists():
+            try:
+                with open(QUERY_CACHE_PATH, "rb") as f:
+                    _query_cache = pickle.load(f)
+            except Exception:
+                pass
+    if _query_cache.get("index_mtime") != _index_mtime():
+        _query_cache = _empty_query_cache()
+        _semantic_index = None
+    now = time.time()
+    live = [e for e in _query_cache["entries"] if now - e["ts"] <= QUERY_CACHE_TTL_SECONDS]
+    if len(live) != len(_query_cache["entries"]):
+        _query_cache["entries"] = live
+        _query_cache["exact"] = {
+            key: entry
+            for key, entry in _query_cache["exact"].items()
+            if now - entry["ts"] <= QUERY_CACHE_TTL_SECONDS
+        }
+        _semantic_index = None
+    return _query_cache
+
+
+def _save_query_cache(cache: dict) -> None:
+    """Persist atomically (temp file + rename). Callers hold _CACHE_LOCK."""
+    QUERY_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = QUERY_CACHE_PATH.with_suffix(".pkl.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(cache, f)
+    os.replace(tmp_path, QUERY_CACHE_PATH)
+
+
+def _get_semantic_index(cache: dict):
+    """Build (lazily) a flat IP index over cached embeddings. Callers hold _CACHE_LOCK."""
+    global _semantic_index
+    import faiss
+    import numpy as np
+
+    if _semantic_index is None and cache["entries"]:
+        dim = len(cache["entries"][0]["embedding"])
+        _semantic_index = faiss.IndexFlatIP(dim)
+        matrix = np.asarray([e["embedding"] for e in cache["entries"]], dtype=np.float32)
+        _semantic_index.add(matrix)
+    return _semantic_index
+
+
+def _embed_question(question: str):
+    """Embed and L2-normalize a question so inner product equals cosine."""
+    import faiss
+    import numpy as np
+
+    vec = np.asarray(get_embeddings().embed_query(question), dtype=np.float32).reshape(1, -1)
+    faiss.normalize_L2(vec)
+    return vec
+
+
+def _cache_lookup(question: str):
+    """
+    Return ((answer, citations), q_emb) on a cache hit, (None, q_emb) on miss.
+    q_emb is returned so the caller can store the result without re-embedding;
+    it is None when the exact tier answered (no embedding was needed).
+    """
+    with _CACHE_LOCK:
+        cache = _load_query_cache()
+        hit = cache["exact"].get(_cache_key(question))
+        if hit is not None:
+            return (hit["answer"], hit["citations"]), None
+        has_entries = bool(cache["entries"])
+    if not has_entries:
+        return None, None
+    # Embed outside the lock: it is a network call and must not serialize
+    # concurrently gathered questions.
+    q_emb = _embed_question(question)
+    with _CACHE_LOCK:
+        cache = _load_query_cache()
+        index = _get_semantic_index(cache)
+        if index is not None:
+            scores, ids = index.search(q_emb, 1)
+            idx = int(ids[0][0])
+            if scores[0][0] >= SEMANTIC_CACHE_THRESHOLD and idx < len(cache["entries"]):
+                entry = cache["entries"][idx]
+                return (entry["answer"], entry["citations"]), q_emb
+    return None, q_emb
+
+
+def _cache_store(question: str, answer: str, citations: list, q_emb=None) -> None:
+    """Record an answered question in both cache tiers and persist to disk."""
+    global _semantic_index
+    if q_emb is None:
+        q_emb = _embed_question(question)
+    with _CACHE_LOCK:
+        cache = _load_query_cache()
+        now = time.time()
+        cache["exact"][_cache_key(question)] = {
+            "answer": answer,
+            "citations": citations,
+            "ts": now,
+        }
+        cache["entries"].append({
+            "embedding": q_emb[0].tolist(),
+            "answer": answer,
+            "citations": citations,
+            "ts": now,
+        })
+        if _semantic_index is not None:
+            _semantic_index.add(q_emb)
+        _save_query_cache(cache)
+
+
+@functools.lru_cache(maxsize=1)
 def get_llm():
-    """Create Gemini chat model."""
+    """Create Gemini chat model (cached so the HTTP client is reused)."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY environment variable is required")
@@ -41,13 +218,31 @@ def get_llm():
     )
 
 
+@functools.lru_cache(maxsize=1)
+def _get_chain():
+    """Build the prompt | llm runnable once and reuse it across calls."""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", RAG_SYSTEM_PROMPT),
+        ("human", RAG_USER_TEMPLATE),
+    ])
+    return prompt | get_llm()
+
+
 def query_rag(question: str, k: int = 2) -> tuple[str, list[dict]]:
     """
     Run RAG: retrieve docs, generate answer, return (answer, citations).
     Citations are derived from retrieved docs, not parsed from LLM output.
+    Repeated (or near-duplicate) questions are served from the answer cache.
     """
-    retriever = get_retriever(k=k)
-    docs = retriever.invoke(question)
+    cached, q_emb = _cache_lookup(question)
+    if cached is not None:
+        return cached
+    if q_emb is None:
+        q_emb = _embed_question(question)
+
+    docs = _adaptive_trim(question, search_with_scores_by_vector(q_emb[0], k=k))
 
     if not docs:
         return (
@@ -57,14 +252,76 @@ def query_rag(question: str, k: int = 2) -> tuple[str, list[dict]]:
 
     context_str, citations = format_context_with_citations(docs)
 
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", RAG_SYSTEM_PROMPT),
-        ("human", RAG_USER_TEMPLATE),
-    ])
+    response = _get_chain().invoke({"context": context_str, "question": question})
+
+    answer = response.content if hasattr(response, "content") else str(response)
+    answer = answer.strip()
+    _cache_store(question, answer, citations, q_emb)
+    return answer, citations
+
+
+def query_rag_stream(question: str, k: int = 2):
+    """
+    Streaming variant of query_rag: yields (partial_answer, citations) as
+    tokens arrive so the UI can render while the model decodes. The final
+    answer is cached exactly like the sync path; cache hits yield once.
+    """
+    cached, q_emb = _cache_lookup(question)
+    if cached is not None:
+        yield cached
+        return
+    if q_emb is None:
+        q_emb = _embed_question(question)
+
+    docs = _adaptive_trim(question, search_with_scores_by_vector(q_emb[0], k=k))
+
+    if not docs:
+        yield (
+            "I cannot find this in the uploaded documents.",
+            [],
+        )
+        return
+
+    context_str, citations = format_context_with_citations(docs)
+
+    partial = ""
+    for chunk in _get_chain().stream({"context": context_str, "question": question}):
+        content = chunk.content if hasattr(chunk, "content") else str(chunk)
+        if content:
+            partial += content
+            yield partial, citations
+
+    answer = partial.strip()
+    _cache_store(question, answer, citations, q_emb)
+    yield answer, citations
+
+
+async def query_rag_async(question: str, k: int = 2) -> tuple[str, list[dict]]:
+    """
+    Async variant of query_rag so independent questions can run concurrently
+    (e.g. asyncio.gather in the sanity script). Same cache, same citations.
+    """
+    # The cache lookup and embedding are blocking network/disk calls; keep
+    # them off the event loop so gathered questions actually overlap.
+    cached, q_emb = await asyncio.to_thread(_cache_lookup, question)
+    if cached is not None:
+        return cached
+    if q_emb is None:
+        q_emb = await asyncio.to_thread(_embed_question, question)
+
+    docs = _adaptive_trim(question, await asearch_with_scores_by_vector(q_emb[0], k=k))
+
+    if not docs:
+        return (
+            "I cannot find this in the uploaded documents.",
+            [],
+        )
+
+    context_str, citations = format_context_with_citations(docs)
 
-    llm = get_llm()
-    chain = prompt | llm
-    response = chain.invoke({"context": context_str, "question": question})
+    response = await _get_chain().ainvoke({"context": context_str, "question": question})
 
     answer = response.content if hasattr(response, "content") else str(response)
-    return answer.strip(), citations
+    answer = answer.strip()
+    await asyncio.to_thread(_cache_store, question, answer, citations, q_emb)
+    return answer, citations
@@ -1,37 +1,66 @@
-"""Retriever setup and citation extraction helpers."""
+"""Vector-store search and citation extraction helpers."""
 
-from .ingestion import load_vector_store
+from .ingestion import FAISS_INDEX_DIR, HNSW_EF_SEARCH, load_vector_store
 
+# Process-wide store cache: (index.faiss mtime, FAISS store). Reloading the
+# index and docstore pickle per question costs tens to hundreds of ms.
+_STORE_CACHE = None
 
-def get_retriever(k: int = 5):
-    """Get a retriever from the FAISS store."""
-    vectorstore = load_vector_store()
-    return vectorstore.as_retriever(search_kwargs={"k": k})
 
+def get_vector_store():
+    """Get the FAISS store, reloading from disk only when the index changes."""
+    global _STORE_CACHE
+    index_file = FAISS_INDEX_DIR / "index.faiss"
+    mtime = index_file.stat().st_mtime if index_file.exists() else None
+    if _STORE_CACHE is None or _STORE_CACHE[0] != mtime:
+        store = load_vector_store()
+        # load_vector_store may have just built the index; re-read the mtime.
+        mtime = index_file.stat().st_mtime if index_file.exists() else None
+        _STORE_CACHE = (mtime, store)
+    return _STORE_CACHE[1]
 
-def doc_to_citation(doc) -> dict:
-    """Convert a retrieved document to citation format for sanity_output.json."""
-    source = doc.metadata.get("source", "unknown")
-    locator = doc.metadata.get("locator") or doc.metadata.get("chunk_id", "unknown")
-    if isinstance(locator, str) and not locator.startswith("chunk"):
-        locator = f"chunk {locator}"
-    snippet = doc.page_content[:500].strip()
-    if len(doc.page_content) > 500:
-        snippet += "..."
-    return {
-        "source": source,
-        "locator": str(locator),
-        "snippet": snippet,
-    }
+
+def search_with_scores_by_vector(embedding, k: int = 5) -> list:
+    """
+    Similarity search for a precomputed query embedding, returning
+    (doc, score) pairs; scores are cosine. Taking the vector instead of the
+    question text lets callers that already embedded the question (e.g. the
+    answer cache) avoid a second embedding round-trip.
+    """
+    vectorstore = get_vector_store()
+    if hasattr(vectorstore.index, "hnsw"):
+        vectorstore.index.hnsw.efSearch = HNSW_EF_SEARCH
+    return vectorstore.similarity_search_with_score_by_vector(embedding, k=k)
+
+
+async def asearch_with_scores_by_vector(embedding, k: int = 5) -> list:
+    """Async variant of search_with_scores_by_vector."""
+    vectorstore = get_vector_store()
+    if hasattr(vectorstore.index, "hnsw"):
+        vectorstore.index.hnsw.efSearch = HNSW_EF_SEARCH
+    return await vectorstore.asimilarity_search_with_score_by_vector(embedding, k=k)
 
 
 def format_context_with_citations(docs: list) -> tuple[str, list[dict]]:
-    """Format retrieved docs as context string and extract citations."""
+    """Format retrieved docs as context string and extract citations in one pass."""
     context_parts = []
     citations = []
     for i, doc in enumerate(docs):
-        source = doc.metadata.get("source", "unknown")
-        locator = doc.metadata.get("locator") or doc.metadata.get("chunk_id", str(i + 1))
-        context_parts.append(f"[{i + 1}] (Source: {source}, {locator})\n{doc.page_content}")
-        citations.append(doc_to_citation(doc))
+        # Read metadata and content once per doc; the citation is built inline
+        # so nothing is sliced or looked up twice.
+        metadata = doc.metadata
+        content = doc.page_content
+        source = metadata.get("source", "unknown")
+        locator = metadata.get("locator") or metadata.get("chunk_id", str(i + 1))
+        if isinstance(locator, str) and not locator.startswith("chunk"):
+            locator = f"chunk {locator}"
+        context_parts.append(f"[{i + 1}] (Source: {source}, {locator})\n{content}")
+        snippet = content[:500].strip()
+        if len(content) > 500:
+            snippet += "..."
+        citations.append({
+            "source": source,
+            "locator": str(locator),
+            "snippet": snippet,
+        })
     return "\n\n---\n\n".join(context_parts), citations